@@ -1,18 +1,26 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
 from utils.logger import log_pipeline_step, log_data_quality_check
+from data_extraction.quality import missing_data_pct
 from config import FAKE_STORE_API_BASE_URL, INVENTORY_SIMULATION_DAYS, RESTOCKING_FREQUENCY, DEMAND_VARIABILITY
 
 class APIConnector:
     def __init__(self):
         self.base_url = FAKE_STORE_API_BASE_URL
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.2)
+        ))
         
     def get_products(self):
         try:          
-            response = requests.get(f"{self.base_url}/products")
+            response = self.session.get(f"{self.base_url}/products")
             response.raise_for_status()
             products = response.json()
             products_df = pd.DataFrame(products)
@@ -23,7 +31,7 @@ class APIConnector:
     
     def get_categories(self):
         try:
-            response = requests.get(f"{self.base_url}/products/categories")
+            response = self.session.get(f"{self.base_url}/products/categories")
             response.raise_for_status()           
             categories = response.json()
             categories_df = pd.DataFrame(categories, columns=['category'])
@@ -32,49 +40,45 @@ class APIConnector:
         except Exception as e:
             return None
     
-    def simulate_inventory(self, products_df, days=INVENTORY_SIMULATION_DAYS):
+    def simulate_inventory(self, products_df, days=INVENTORY_SIMULATION_DAYS, seed=None):
         try:
-            inventory_data = []
+            rng = np.random.default_rng(seed)
+            ids = products_df['id'].to_numpy()
+            titles = products_df['title'].to_numpy()
+            categories = products_df['category'].to_numpy()
+            prices = products_df['price'].to_numpy(dtype=np.float64)
+            n_products = len(prices)
             current_date = datetime.now() - timedelta(days=days)
-            
-            for day in range(days):
-                date = current_date + timedelta(days=day)
-                
-                for _, product in products_df.iterrows():
-                    base_demand = random.randint(1, 10)
-                    demand_variability = random.uniform(1 - DEMAND_VARIABILITY, 1 + DEMAND_VARIABILITY)
-                    daily_demand = max(0, int(base_demand * demand_variability))
-                    if day == 0:
-                        current_stock = random.randint(50, 200)  # Initial stock
-                    else:
-                        prev_record = next((r for r in inventory_data if r['product_id'] == product['id'] and r['date'] == date - timedelta(days=1)), None)
-                        current_stock = prev_record['stock_level'] if prev_record else random.randint(50, 200)
-                    new_stock = current_stock - daily_demand
-                    if day % RESTOCKING_FREQUENCY == 0:
-                        restock_amount = random.randint(50, 100)
-                        new_stock += restock_amount
-                        restocked = True
-                    else:
-                        restock_amount = 0
-                        restocked = False
-                    price_change = random.uniform(0.95, 1.05)
-                    new_price = product['price'] * price_change
-                    inventory_record = {
-                        'date': date,
-                        'product_id': product['id'],
-                        'product_name': product['title'],
-                        'category': product['category'],
-                        'daily_demand': daily_demand,
-                        'stock_level': max(0, new_stock),
-                        'restock_amount': restock_amount,
-                        'restocked': restocked,
-                        'price': new_price,
-                        'original_price': product['price'],
-                        'price_change_pct': ((new_price - product['price']) / product['price']) * 100
-                    }
-                    
-                    inventory_data.append(inventory_record)
-            inventory_df = pd.DataFrame(inventory_data)
+
+            base_demand = rng.integers(1, 11, size=(days, n_products))
+            demand_variability = rng.uniform(1 - DEMAND_VARIABILITY, 1 + DEMAND_VARIABILITY, size=(days, n_products))
+            daily_demand = np.maximum(0, (base_demand * demand_variability).astype(np.int64))
+
+            restock_days = (np.arange(days) % RESTOCKING_FREQUENCY == 0)[:, None]
+            restock_amount = np.where(restock_days, rng.integers(50, 101, size=(days, n_products)), 0)
+
+            # Stock is clamped at zero every day, so a plain cumsum is not enough:
+            # the running minimum of the unclamped level gives the same result.
+            initial_stock = rng.integers(50, 201, size=n_products)
+            level = initial_stock + np.cumsum(restock_amount - daily_demand, axis=0)
+            stock_level = level - np.minimum(0, np.minimum.accumulate(level, axis=0))
+
+            price_change = rng.uniform(0.95, 1.05, size=(days, n_products))
+            new_price = prices[None, :] * price_change
+
+            inventory_df = pd.DataFrame({
+                'date': np.repeat(pd.date_range(current_date, periods=days, freq='D'), n_products),
+                'product_id': np.tile(ids, days),
+                'product_name': np.tile(titles, days),
+                'category': np.tile(categories, days),
+                'daily_demand': daily_demand.ravel(),
+                'stock_level': stock_level.ravel(),
+                'restock_amount': restock_amount.ravel(),
+                'restocked': np.repeat(restock_days.ravel(), n_products),
+                'price': new_price.ravel(),
+                'original_price': np.tile(prices, days),
+                'price_change_pct': ((price_change - 1) * 100).ravel()
+            })
             inventory_df = self._calculate_inventory_metrics(inventory_df)
             
             return inventory_df
@@ -83,7 +87,7 @@ class APIConnector:
             return None
     
     def _validate_products_data(self, df):
-        missing_pct = df.isnull().sum().sum() / (df.shape[0] * df.shape[1])
+        missing_pct = missing_data_pct(df)
         if missing_pct > 0.05:
             log_data_quality_check("Products Missing Data", "WARNING", f"Missing data: {missing_pct:.2%}")
         else:
@@ -104,27 +108,19 @@ class APIConnector:
                 log_data_quality_check("Products Price Validation", "PASS")
     
     def _calculate_inventory_metrics(self, df):
+        demand = df['daily_demand'].to_numpy(dtype=np.float64)
+        stock = df['stock_level'].to_numpy(dtype=np.float64)
 
-        df['days_of_inventory'] = np.where(
-            df['daily_demand'] > 0,
-            df['stock_level'] / df['daily_demand'],
-            float('inf')
-        )
-
-        df['stockout_risk'] = df['days_of_inventory'] < 3
-        df['annualized_turnover'] = np.where(
-            df['stock_level'] > 0,
-            (df['daily_demand'] * 365) / df['stock_level'],
-            0
-        )
-
-        df['fill_rate'] = np.where(
-            df['daily_demand'] > 0,
-            np.minimum(1.0, df['stock_level'] / df['daily_demand']),
-            1.0
-        )
+        # Stock/demand is divided once and reused: its inf for zero demand already
+        # gives no stockout risk and a fill rate of 1.0.
+        days_of_inventory = np.divide(stock, demand, out=np.full(len(df), np.inf), where=demand > 0)
         
-        return df
+        return df.assign(
+            days_of_inventory=days_of_inventory,
+            stockout_risk=days_of_inventory < 3,
+            annualized_turnover=np.divide(demand * 365, stock, out=np.zeros(len(df)), where=stock > 0),
+            fill_rate=np.minimum(1.0, days_of_inventory)
+        )
     
     def get_all_api_data(self):
         data = {}
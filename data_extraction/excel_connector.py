@@ -1,15 +1,71 @@
 import pandas as pd
+import numpy as np
 import os
+import hashlib
 import kaggle
+import openpyxl
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from utils.logger import log_pipeline_step, log_data_quality_check
+from data_extraction.quality import EXCEL_ENGINE, missing_data_pct
 from config import DATA_DIR, EXCEL_FILE_PATH, KAGGLE_DATASET_NAME
 
+# Columns the pipeline actually uses; everything else in the sheets is skipped at read time.
+ORDERS_COLUMNS = [
+    'Order ID', 'Order Date', 'Ship Date', 'Customer ID', 'Product ID', 'Sales', 'Quantity',
+    'Category', 'Sub-Category', 'Region', 'Segment', 'Country', 'State', 'City', 'Ship Mode'
+]
+ORDERS_REQUIRED_COLUMNS = ['Order ID', 'Order Date', 'Ship Date', 'Customer ID', 'Product ID']
+RETURNS_COLUMNS = ['Returned', 'Order ID', 'Return Date']
+PEOPLE_COLUMNS = ['Person', 'Region']
+
+# Bump whenever the transforms change the cached frames' columns or dtypes.
+CACHE_VERSION = 2
+
 class ExcelConnector:
     
     def __init__(self):
         self.data_dir = DATA_DIR
         self.excel_file_path = EXCEL_FILE_PATH
+
+    def _open_excel_file(self):
+        # One handle per loader; workbook readers are not thread-safe.
+        return pd.ExcelFile(self.excel_file_path, engine=EXCEL_ENGINE)
+
+    def _cache_path(self, name, columns):
+        key = hashlib.md5(repr((CACHE_VERSION, columns)).encode()).hexdigest()[:8]
+        return os.path.join(self.data_dir, f'{name}-{key}.parquet')
+
+    def _read_cache(self, name, columns):
+        cache_path = self._cache_path(name, columns)
+        if not os.path.exists(cache_path):
+            return None
+        if os.path.exists(self.excel_file_path) and os.path.getmtime(self.excel_file_path) > os.path.getmtime(cache_path):
+            return None
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception as e:
+            return None
+
+    def _write_cache(self, df, name, columns):
+        # Swapped in atomically so an interrupted write never leaves a truncated cache.
+        cache_path = self._cache_path(name, columns)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        try:
+            df.to_parquet(tmp_path, compression='zstd')
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _precheck_columns(self, sheet_name, required_columns, header):
+        missing_columns = [col for col in required_columns if col not in header]
+        if missing_columns:
+            log_data_quality_check(f"{sheet_name} Required Columns", "FAIL", f"Missing columns: {missing_columns}")
+        else:
+            log_data_quality_check(f"{sheet_name} Required Columns", "PASS")
+        return not missing_columns
+
     def download_dataset(self):
         try:
             os.makedirs(self.data_dir, exist_ok=True)
@@ -24,90 +80,186 @@ class ExcelConnector:
     
     def load_orders_data(self):
         try:
-            orders_df = pd.read_excel(self.excel_file_path, sheet_name='Orders')
+            orders_df = self._read_cache('orders', ORDERS_COLUMNS)
+            if orders_df is not None:
+                return orders_df
+            # Header-only reads are only cheap with openpyxl; calamine parses the whole sheet.
+            header_precheck = EXCEL_ENGINE == 'openpyxl'
+            with self._open_excel_file() as excel_file:
+                if header_precheck:
+                    header = excel_file.parse(sheet_name='Orders', nrows=0).columns
+                    if not self._precheck_columns('Orders', ORDERS_REQUIRED_COLUMNS, header):
+                        return None
+                orders_df = excel_file.parse(
+                    sheet_name='Orders',
+                    usecols=lambda col: col in ORDERS_COLUMNS,
+                    dtype={
+                        'Order ID': 'string',
+                        'Customer ID': 'string',
+                        'Product ID': 'string'
+                    }
+                )
+            if not header_precheck and not self._precheck_columns('Orders', ORDERS_REQUIRED_COLUMNS, orders_df.columns):
+                return None
             self._validate_orders_data(orders_df)
             orders_df = self._transform_orders_data(orders_df)
+            orders_df = self._categorize_orders_data(orders_df)
+            self._write_cache(orders_df, 'orders', ORDERS_COLUMNS)
             return orders_df
         except Exception as e:
             return None
     
+    def load_orders_data_chunked(self, chunksize=50_000):
+        # Errors propagate so a failure mid-sheet never looks like a short sheet.
+        # Text columns stay uncategorized; cast them once after concatenating chunks.
+        workbook = openpyxl.load_workbook(self.excel_file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook['Orders'].iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            if not self._precheck_columns('Orders', ORDERS_REQUIRED_COLUMNS, header):
+                raise ValueError("Orders sheet is missing required columns")
+            keep = [i for i, col in enumerate(header) if col in ORDERS_COLUMNS]
+            columns = [header[i] for i in keep]
+            missing_cells = total_cells = 0
+            for batch in self._iter_row_batches(rows, keep, chunksize):
+                chunk = self._orders_chunk_to_frame(batch, columns)
+                missing_cells += chunk.isna().to_numpy().sum()
+                total_cells += chunk.size
+                yield self._transform_orders_data(chunk)
+            self._log_orders_missing_data(missing_cells / total_cells if total_cells else 0.0)
+        finally:
+            workbook.close()
+    
+    def _iter_row_batches(self, rows, keep, chunksize):
+        batch = []
+        for row in rows:
+            # Read-only rows can be ragged when trailing cells are empty.
+            batch.append([row[i] if i < len(row) else None for i in keep])
+            if len(batch) == chunksize:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def _orders_chunk_to_frame(self, rows, columns):
+        df = pd.DataFrame(rows, columns=columns)
+        for col in ['Order ID', 'Customer ID', 'Product ID']:
+            df[col] = df[col].astype('string')
+        return df
+    
     def load_returns_data(self):
         try:
-            returns_df = pd.read_excel(self.excel_file_path, sheet_name='Returns')
+            returns_df = self._read_cache('returns', RETURNS_COLUMNS)
+            if returns_df is not None:
+                return returns_df
+            with self._open_excel_file() as excel_file:
+                returns_df = excel_file.parse(
+                    sheet_name='Returns',
+                    usecols=lambda col: col in RETURNS_COLUMNS
+                )
             self._validate_returns_data(returns_df)
             returns_df = self._transform_returns_data(returns_df)
+            self._write_cache(returns_df, 'returns', RETURNS_COLUMNS)
             return returns_df
         except Exception as e:
             return None
     
     def load_people_data(self):
         try:
-            people_df = pd.read_excel(self.excel_file_path, sheet_name='People')
+            people_df = self._read_cache('people', PEOPLE_COLUMNS)
+            if people_df is not None:
+                return people_df
+            with self._open_excel_file() as excel_file:
+                people_df = excel_file.parse(
+                    sheet_name='People',
+                    usecols=lambda col: col in PEOPLE_COLUMNS
+                )
             self._validate_people_data(people_df)
             people_df = self._transform_people_data(people_df)
+            self._write_cache(people_df, 'people', PEOPLE_COLUMNS)
             return people_df
         except Exception as e:
             return None
     
     def _validate_orders_data(self, df):
-        missing_pct = df.isnull().sum().sum() / (df.shape[0] * df.shape[1])
+        self._log_orders_missing_data(missing_data_pct(df))
+    
+    def _log_orders_missing_data(self, missing_pct):
         if missing_pct > 0.05:  # 5% threshold
             log_data_quality_check("Orders Missing Data", "WARNING", f"Missing data: {missing_pct:.2%}")
         else:
             log_data_quality_check("Orders Missing Data", "PASS", f"Missing data: {missing_pct:.2%}")
-        required_columns = ['Order ID', 'Order Date', 'Ship Date', 'Customer ID', 'Product ID']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            log_data_quality_check("Orders Required Columns", "FAIL", f"Missing columns: {missing_columns}")
-        else:
-            log_data_quality_check("Orders Required Columns", "PASS")
     
     def _validate_returns_data(self, df):
-        missing_pct = df.isnull().sum().sum() / (df.shape[0] * df.shape[1])
+        missing_pct = missing_data_pct(df)
         if missing_pct > 0.05:
             log_data_quality_check("Returns Missing Data", "WARNING", f"Missing data: {missing_pct:.2%}")
         else:
             log_data_quality_check("Returns Missing Data", "PASS", f"Missing data: {missing_pct:.2%}")
     
     def _validate_people_data(self, df):
-        missing_pct = df.isnull().sum().sum() / (df.shape[0] * df.shape[1])
+        missing_pct = missing_data_pct(df)
         if missing_pct > 0.05:
             log_data_quality_check("People Missing Data", "WARNING", f"Missing data: {missing_pct:.2%}")
         else:
             log_data_quality_check("People Missing Data", "PASS", f"Missing data: {missing_pct:.2%}")
     
     def _transform_orders_data(self, df):
-        date_columns = ['Order Date', 'Ship Date']
-        for col in date_columns:
-            if col in df.columns:
+        for col in ['Order Date', 'Ship Date']:
+            if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
                 df[col] = pd.to_datetime(df[col])
         
+        # NaT has no integer encoding, so those columns fall back to the .dt accessors.
         if 'Order Date' in df.columns and 'Ship Date' in df.columns:
-            df['Lead Time (Days)'] = (df['Ship Date'] - df['Order Date']).dt.days
+            lead_time = df['Ship Date'].values - df['Order Date'].values
+            if np.isnat(lead_time).any():
+                df['Lead Time (Days)'] = (df['Ship Date'] - df['Order Date']).dt.days.astype('Int32')
+            else:
+                df['Lead Time (Days)'] = pd.array(lead_time.astype('timedelta64[D]').astype(np.int32), dtype='Int32')
         
         if 'Order Date' in df.columns:
-            df['Order Year'] = df['Order Date'].dt.year
-            df['Order Month'] = df['Order Date'].dt.month
-            df['Order Quarter'] = df['Order Date'].dt.quarter
+            order_dates = df['Order Date'].values
+            if np.isnat(order_dates).any():
+                df['Order Year'] = df['Order Date'].dt.year.astype('Int32')
+                df['Order Month'] = df['Order Date'].dt.month.astype('Int32')
+                df['Order Quarter'] = df['Order Date'].dt.quarter.astype('Int32')
+            else:
+                months = order_dates.astype('datetime64[M]').astype(np.int64)
+                df['Order Year'] = pd.array((months // 12 + 1970).astype(np.int32), dtype='Int32')
+                df['Order Month'] = pd.array((months % 12 + 1).astype(np.int32), dtype='Int32')
+                df['Order Quarter'] = pd.array(((months % 12) // 3 + 1).astype(np.int32), dtype='Int32')
         
         if 'Sales' in df.columns and 'Quantity' in df.columns:
             df['Order Value'] = df['Sales'] * df['Quantity']
         
         return df
     
+    def _categorize_orders_data(self, df):
+        category_columns = ['Category', 'Sub-Category', 'Segment', 'Region', 'Ship Mode', 'Country', 'State', 'City']
+        for col in category_columns:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
+        return df
+    
     def _transform_returns_data(self, df):
-        if 'Return Date' in df.columns:
+        if 'Return Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Return Date']):
             df['Return Date'] = pd.to_datetime(df['Return Date'])
         return df
     
     def _transform_people_data(self, df):
         if 'Person' not in df.columns:
             df['Person'] = 'Unknown'
+        if 'Region' in df.columns:
+            df['Region'] = df['Region'].astype('category')
         return df
     
     def get_all_data(self):
-        data = {}        
-        data['orders'] = self.load_orders_data()
-        data['returns'] = self.load_returns_data()
-        data['people'] = self.load_people_data()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'orders': executor.submit(self.load_orders_data),
+                'returns': executor.submit(self.load_returns_data),
+                'people': executor.submit(self.load_people_data)
+            }
+            data = {name: future.result() for name, future in futures.items()}
         return data 
\ No newline at end of file
@@ -0,0 +1,12 @@
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+
+def missing_data_pct(df):
+    total = df.shape[0] * df.shape[1]
+    if total == 0:
+        return 0.0
+    return df.isna().to_numpy().sum() / total
@@ -1,8 +1,13 @@
 import pandas as pd
+from data_extraction.quality import EXCEL_ENGINE
 
-
-orders = pd.read_excel('train_with_return.xlsx', sheet_name='train')
-returns = pd.read_excel('train_with_return.xlsx', sheet_name='Return')
+with pd.ExcelFile('train_with_return.xlsx', engine=EXCEL_ENGINE) as xl:
+    sheets = xl.parse(
+        sheet_name=['train', 'Return'],
+        parse_dates=['Order Date', 'Ship Date'],
+        dtype={'Order ID': 'string', 'Customer ID': 'string', 'Product ID': 'string'},
+    )
+orders, returns = sheets['train'], sheets['Return']
 # Sample data exploration
 # print(f"Total orders: {len(orders)}")
 # print(f"Date range: {orders['Order Date'].min()} to {orders['Order Date'].max()}")